@@ -41,7 +41,7 @@ with metrics_col_models:
 col_upload, col_process, col_visualize = st.columns(3)
 
 with col_upload:
-    st.success("**Upload Data** \n\n Import CSV, Text, and Excel files for analysis.")
+    st.success("**Upload Data** \n\n Import CSV, Text, Excel, and Parquet files for analysis.")
 
 with col_process:
     st.warning("**Process Data** \n\n Clean, filter, and transform your datasets.")
@@ -2,83 +2,423 @@
 This page will allow importing CSV and Excel data for processing & analysis
 '''
 
+import csv
+import io
+import warnings
+
+import numpy as np
 import streamlit as st
 import pandas as pd
 
+import pyarrow.csv as pacsv
+
+# Optional fast readers - fall back to the default pandas readers when not installed
+try:
+    import polars as pl
+    import polars.selectors as cs
+except ImportError:
+    pl = None
+
+try:
+    import python_calamine  # noqa: F401 - only needed so pandas can use engine="calamine"
+    EXCEL_ENGINE = "calamine"
+except ImportError:
+    EXCEL_ENGINE = None
+
+# Text files above this size are never held as one DataFrame - they are read in chunks so peak
+# memory scales with the chunk, not the file (kept under Streamlit's default 200 MB upload limit)
+LARGE_FILE_BYTES = 100 * 1024 * 1024
+CSV_CHUNK_ROWS = 500_000
+
+# Upper bound on points sent to the browser for the line chart
+MAX_CHART_POINTS = 5000
+# Number of rows shown at a time in the Raw Table tab
+RAW_TABLE_ROWS = 1000
+
+
+# --- Cached helpers so widget interactions don't re-parse or re-aggregate the upload ---
+# Caches are shared by every session on the server, so only the most recent uploads are kept
+MAX_CACHED_UPLOADS = 3
+
+# Helpers that take the parsed frame or raw bytes are keyed on the upload's file_id; the leading
+# underscore on _df/_data tells Streamlit not to hash the whole upload on every rerun
+def sniff_delimiter(data: bytes) -> str | None:
+    '''Guess the delimiter of a text data file from its first few lines (None if it can't be guessed)'''
+    sample = data[:64 * 1024].decode("utf-8", errors="ignore")
+    try:
+        return csv.Sniffer().sniff(sample, delimiters=",;\t|").delimiter
+    except csv.Error:
+        return None
+
+
+def text_reader_options(data: bytes) -> dict:
+    '''Return the pd.read_csv sep/engine for a text file, letting pandas' python engine detect odd delimiters'''
+    delimiter = sniff_delimiter(data)
+    if delimiter is None:
+        return {"sep": None, "engine": "python"}
+    return {"sep": delimiter, "engine": "c"}
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def load_df(name: str, data: bytes) -> pd.DataFrame:
+    '''Parse the uploaded file contents into a DataFrame based on its extension'''
+    file_extension = name.rsplit(".", 1)[-1].lower()
+
+    # Read .csv or .txt file - Arrow's multithreaded parser when the delimiter is known
+    if file_extension in ["csv", "txt"]:
+        reader_options = text_reader_options(data)
+        if reader_options["sep"] is None:
+            return pd.read_csv(io.BytesIO(data), **reader_options)
+        table = pacsv.read_csv(
+            io.BytesIO(data),
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+            parse_options=pacsv.ParseOptions(delimiter=reader_options["sep"]),
+        )
+        return table.to_pandas(types_mapper=pd.ArrowDtype)
+    # Read Parquet file - already typed and columnar, so no text parsing
+    if file_extension == "parquet":
+        return pd.read_parquet(io.BytesIO(data))
+    # Read a variety of Excel file types
+    return pd.read_excel(io.BytesIO(data), engine=EXCEL_ENGINE)
+
+
+def format_summary_stats(describe_data: pd.DataFrame) -> pd.DataFrame:
+    '''Add Peak-to-Peak to describe()-style statistics and reorder/rename the rows'''
+    # Add peak-to-peak (max-min) statistic
+    describe_data.loc["Peak-to-Peak"] = describe_data.loc["max"] - describe_data.loc["min"]
+
+    # Reorder rows
+    describe_order = ["min", "max", "Peak-to-Peak", "mean", "std", "count", "25%", "50%", "75%"]
+    describe_data = describe_data.loc[describe_order]
+
+    describe_data.rename(index={
+        "min": "Minimum",
+        "max": "Maximum",
+    }, inplace=True)
+
+    return describe_data
+
+
+@st.cache_resource(show_spinner=False)
+def get_moments_kernel():
+    '''Compile the single-pass moments kernel once per server process (None if numba is not installed)'''
+    try:
+        from numba import njit
+    except ImportError:
+        return None
+
+    @njit
+    def column_moments(values):
+        # Rows of the result: count, mean, std, min, max - NaNs are skipped like pandas does
+        num_rows, num_cols = values.shape
+        moments = np.full((5, num_cols), np.nan)
+        for col in range(num_cols):
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+            minimum = np.inf
+            maximum = -np.inf
+            # Welford's update gives mean and variance in the same pass as min/max
+            for row in range(num_rows):
+                value = values[row, col]
+                if np.isnan(value):
+                    continue
+                count += 1
+                delta = value - mean
+                mean += delta / count
+                m2 += delta * (value - mean)
+                minimum = min(minimum, value)
+                maximum = max(maximum, value)
+            moments[0, col] = count
+            if count > 0:
+                moments[1, col] = mean
+                moments[3, col] = minimum
+                moments[4, col] = maximum
+            if count > 1:
+                moments[2, col] = np.sqrt(m2 / (count - 1))
+        return moments
+
+    return column_moments
+
+
+def compute_moments(values: np.ndarray) -> np.ndarray:
+    '''Return count/mean/std/min/max rows for each column of a float array, ignoring NaNs'''
+    column_moments = get_moments_kernel()
+    if column_moments is not None:
+        return column_moments(values)
+
+    # All-NaN columns come out as NaN; silence numpy's empty-slice warnings for them
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        return np.vstack([
+            np.count_nonzero(~np.isnan(values), axis=0),
+            np.nanmean(values, axis=0),
+            np.nanstd(values, axis=0, ddof=1),
+            np.nanmin(values, axis=0),
+            np.nanmax(values, axis=0),
+        ])
+
+
+def compute_quartiles(column: np.ndarray) -> list:
+    '''Return the 25%, 50%, and 75% quantiles (linear interpolation, like pandas) using one partition'''
+    column = column[~np.isnan(column)]
+    if len(column) == 0:
+        return [np.nan] * 3
+
+    positions = [q * (len(column) - 1) for q in (0.25, 0.5, 0.75)]
+    kth = sorted({int(np.floor(pos)) for pos in positions} | {int(np.ceil(pos)) for pos in positions})
+    partitioned = np.partition(column, kth)
+
+    quartiles = []
+    for pos in positions:
+        lower, upper = partitioned[int(np.floor(pos))], partitioned[int(np.ceil(pos))]
+        quartiles.append(lower + (upper - lower) * (pos - np.floor(pos)))
+    return quartiles
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def get_summary_stats(file_id: str, _df: pd.DataFrame) -> pd.DataFrame:
+    '''Return describe() statistics with Peak-to-Peak added and rows reordered'''
+    numeric_df = _df.select_dtypes(include="number")
+    # Column-major copy so each column is contiguous for the per-column passes
+    values = np.asfortranarray(numeric_df.to_numpy(dtype=np.float64, na_value=np.nan))
+
+    count, mean, std, minimum, maximum = compute_moments(values)
+    quartiles = np.array([compute_quartiles(values[:, col]) for col in range(values.shape[1])]).reshape(-1, 3).T
+
+    describe_data = pd.DataFrame(
+        np.vstack([count, mean, std, minimum, quartiles, maximum]),
+        index=["count", "mean", "std", "min", "25%", "50%", "75%", "max"],
+        columns=numeric_df.columns,
+    )
+    return format_summary_stats(describe_data)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def get_lazy_summary_stats(file_id: str, _data: bytes) -> pd.DataFrame | None:
+    '''Compute describe() statistics with a lazy Polars scan (None if there is nothing numeric to describe)'''
+    delimiter = sniff_delimiter(_data)
+    # Polars can't detect the delimiter itself, so leave those files to the chunked summary
+    if delimiter is None:
+        return None
+    # Infer dtypes from the whole file - instrument traces often look like integers for the first rows
+    lazy_frame = pl.scan_csv(io.BytesIO(_data), separator=delimiter, infer_schema_length=None)
+    numeric_frame = lazy_frame.select(cs.numeric())
+    if not numeric_frame.collect_schema():
+        return None
+    describe_data = numeric_frame.describe(interpolation="linear").to_pandas()
+    describe_data = describe_data.set_index("statistic").rename_axis(None).drop(index="null_count")
+    return format_summary_stats(describe_data)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def scan_large_text_file(file_id: str, _data: bytes) -> dict:
+    '''Read a large text file chunk by chunk, keeping only the metrics, summary, and chart points the page shows'''
+    # Line count is only used to size the chart buckets, so quoted newlines don't matter here
+    estimated_rows = max(_data.count(b"\n"), 1)
+    num_rows = 0
+    missing_values = 0
+    column_names = numeric_columns = None
+    chunk_minimums, chunk_maximums, chart_parts = [], [], []
+
+    for chunk in pd.read_csv(io.BytesIO(_data), chunksize=CSV_CHUNK_ROWS, **text_reader_options(_data)):
+        if numeric_columns is None:
+            column_names = list(chunk.columns)
+            numeric_columns = chunk.select_dtypes(include="number").columns
+            stride = -(-2 * estimated_rows * max(len(numeric_columns), 1) // MAX_CHART_POINTS)
+            count = pd.Series(0.0, index=numeric_columns)
+            mean = pd.Series(0.0, index=numeric_columns)
+            m2 = pd.Series(0.0, index=numeric_columns)
+
+        missing_values += int(np.count_nonzero(chunk.isna().to_numpy()))
+        chunk = chunk[numeric_columns].apply(pd.to_numeric, errors="coerce")
+
+        chunk_count = chunk.count()
+        chunk_mean = chunk.mean().fillna(0.0)
+        chunk_m2 = ((chunk - chunk_mean) ** 2).sum()
+
+        # Merge running mean and sum of squared deviations (Chan et al. parallel variance)
+        total = count + chunk_count
+        delta = chunk_mean - mean
+        weight = (chunk_count / total).fillna(0.0)
+        mean = mean + delta * weight
+        m2 = m2 + chunk_m2 + delta ** 2 * count * weight
+        count = total
+
+        chunk_minimums.append(chunk.min())
+        chunk_maximums.append(chunk.max())
+        if len(numeric_columns) > 0:
+            chart_parts.append(bucket_extremes(chunk, stride, row_offset=num_rows))
+        num_rows += len(chunk)
+
+    summary_stats = None
+    chart_df = pd.DataFrame()
+    if numeric_columns is not None and len(numeric_columns) > 0:
+        minimum = pd.concat(chunk_minimums, axis=1).min(axis=1)
+        maximum = pd.concat(chunk_maximums, axis=1).max(axis=1)
+        # Quartiles need the full column, so they are left out of the streamed summary
+        summary_stats = pd.DataFrame({
+            "Minimum": minimum,
+            "Maximum": maximum,
+            "Peak-to-Peak": maximum - minimum,
+            "mean": mean.where(count > 0),
+            "std": np.sqrt(m2 / (count - 1)).where(count > 1),
+            "count": count,
+        }).T
+        chart_df = pd.concat(chart_parts).interpolate(method="index", limit_area="inside")
+
+    return {
+        "rows": num_rows,
+        "columns": column_names or [],
+        "missing_values": missing_values,
+        "summary": summary_stats,
+        "chart": chart_df,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def read_text_window(file_id: str, _data: bytes, start_row: int, column_names: list) -> pd.DataFrame:
+    '''Read RAW_TABLE_ROWS rows starting at start_row straight from a text file'''
+    return pd.read_csv(
+        io.BytesIO(_data),
+        skiprows=start_row + 1,  # + 1 for the header line
+        nrows=RAW_TABLE_ROWS,
+        header=None,
+        names=column_names,
+        **text_reader_options(_data),
+    )
+
+
+def bucket_extremes(numeric_df: pd.DataFrame, stride: int, row_offset: int = 0) -> pd.DataFrame:
+    '''Keep each stride-row bucket's min and max per column, at the row numbers where they occur'''
+    num_rows = len(numeric_df)
+    num_buckets = -(-num_rows // stride)
+    bucket_starts = np.arange(num_buckets) * stride
+
+    chart_columns = {}
+    for name, column in numeric_df.items():
+        values = column.to_numpy(dtype=np.float64, na_value=np.nan)
+        # Pad to whole buckets so each bucket is one row of a (num_buckets, stride) grid
+        grid = np.full(num_buckets * stride, np.nan)
+        grid[:num_rows] = values
+        grid = grid.reshape(num_buckets, stride)
+        missing = np.isnan(grid)
+        has_values = ~missing.all(axis=1)
+
+        min_rows = bucket_starts + np.argmin(np.where(missing, np.inf, grid), axis=1)
+        max_rows = bucket_starts + np.argmax(np.where(missing, -np.inf, grid), axis=1)
+        # np.unique also sorts, so each min/max pair is drawn in the order it was measured
+        rows = np.unique(np.concatenate([min_rows[has_values], max_rows[has_values]]))
+        chart_columns[name] = pd.Series(values[rows], index=rows + row_offset)
+
+    # Columns peak at different rows; fill each one in between its own points so lines don't break
+    chart_df = pd.concat(chart_columns, axis=1).sort_index()
+    return chart_df.interpolate(method="index", limit_area="inside")
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def downsample_for_chart(file_id: str, _df: pd.DataFrame, max_points: int = MAX_CHART_POINTS) -> pd.DataFrame:
+    '''Reduce numeric columns to about max_points rows, keeping each bucket's min and max so spikes survive'''
+    numeric_df = _df.select_dtypes(include="number")
+    num_rows = len(numeric_df)
+    if num_rows <= max_points:
+        return numeric_df
+
+    # Each bucket contributes up to two rows (its min and max) per column
+    stride = -(-2 * num_rows * max(len(numeric_df.columns), 1) // max_points)
+    return bucket_extremes(numeric_df, stride)
+
+
+@st.cache_data(show_spinner=False, max_entries=MAX_CACHED_UPLOADS)
+def count_missing_values(file_id: str, _df: pd.DataFrame) -> int:
+    '''Return the total number of missing values in the DataFrame'''
+    # All-float frames: one isnan pass over the values block
+    if all(isinstance(dtype, np.dtype) and dtype.kind == "f" for dtype in _df.dtypes):
+        return int(np.count_nonzero(np.isnan(_df.to_numpy())))
+    # Mixed or Arrow-backed columns: count the null mask directly, skipping the per-column Series
+    return int(np.count_nonzero(_df.isna().to_numpy()))
+
+
 st.title("Analyze Data Page")
 
 # Upload File
 st.markdown("### 🔼 Upload File")
-uploaded_file = st.file_uploader("Upload CSV, Excel, or Text data files", type=['csv', 'xlsx', 'xlsm', 'xls', 'txt'])
+uploaded_file = st.file_uploader("Upload CSV, Excel, Parquet, or Text data files", type=['csv', 'xlsx', 'xlsm', 'xls', 'parquet', 'txt'])
 
-# Empty DataFrame for default no file upload
-df = pd.DataFrame(columns=['col1']) # Empty DataFrame
+# Nothing below needs to run until a file is uploaded
+if not uploaded_file:
+    st.warning("No data file uploaded")
+    st.stop()
 
 # Read Uploaded File
-if uploaded_file:
-    st.balloons() 
-    filename = uploaded_file.name
-    # Split filename and extension
-    # Normalize filename extension in case user uploads file with incorrect case for extension (i.e data.CsV)
-    filename, file_extension = filename.rsplit(".", 1)
-    file_extension = file_extension.lower()
-
-    # Read .csv or .txt file
-    if file_extension in ["csv", "txt"]:
-        df = pd.read_csv(uploaded_file, sep=None, engine="python")  
-        st.success(f"{filename} was successfully uploaded!")
-    # Read a variety of Excel file types
-    elif file_extension in ["xlsx", "xlsm", "xls"]:
-        df = pd.read_excel(uploaded_file)
-        st.success(f"{filename} was successfully uploaded!") 
+st.balloons() 
+filename = uploaded_file.name
+# Split filename and extension
+# Normalize filename extension in case user uploads file with incorrect case for extension (i.e data.CsV)
+filename, file_extension = filename.rsplit(".", 1)
+file_extension = file_extension.lower()
+
+# Parsed once per distinct upload; reruns hit the cache
+file_bytes = uploaded_file.getvalue()
+is_large_text_file = file_extension in ["csv", "txt"] and len(file_bytes) > LARGE_FILE_BYTES
+if is_large_text_file:
+    # One chunked pass keeps only what the page displays instead of the whole DataFrame
+    large_file_scan = scan_large_text_file(uploaded_file.file_id, file_bytes)
+    num_rows = large_file_scan["rows"]
+    column_names = large_file_scan["columns"]
+    missing_values = large_file_scan["missing_values"]
+    chart_df = large_file_scan["chart"]
 else:
-    st.warning("No data file uploaded")
+    df = load_df(uploaded_file.name, file_bytes)
+    num_rows = len(df)
+    column_names = list(df.columns)
+    missing_values = count_missing_values(uploaded_file.file_id, df)
+    chart_df = downsample_for_chart(uploaded_file.file_id, df)
+st.success(f"{filename} was successfully uploaded!")
 
 # Quick metrics
-if uploaded_file:
-    st.markdown("### ⚡ Quick Metrics")
-    metrics_rows, metrics_cols, metrics_missing = st.columns(3)
-    metrics_rows.metric("Rows", len(df))
-    metrics_cols.metric("Columns", len(df.columns))
-    metrics_missing.metric("Missing Values", df.isna().sum().sum())
-# If no file uploaded, then metrics should be 0
-else:
-    st.markdown("### ⚡ Quick Metrics")
-    metrics_rows, metrics_cols, metrics_missing = st.columns(3)
-    metrics_rows.metric("Rows", len(df))
-    metrics_cols.metric("Columns", len(df.columns) - 1)
-    metrics_missing.metric("Missing Values", df.isna().sum().sum())
+st.markdown("### ⚡ Quick Metrics")
+metrics_rows, metrics_cols, metrics_missing = st.columns(3)
+metrics_rows.metric("Rows", num_rows)
+metrics_cols.metric("Columns", len(column_names))
+metrics_missing.metric("Missing Values", missing_values)
 
 # Analysis Tabs for Summary Stats, Plot Data, & Raw Table
 summary_tab, plot_tab, raw_table_tab = st.tabs(["📈 Summary Stats", "📉 Plot Data", "📄 Raw Table"])
     
 with summary_tab:
-    if not df.empty and df.select_dtypes(include='number').shape[1] > 0:
-        describe_data = df.describe()
+    summary_stats = None
+    if is_large_text_file:
+        # Polars adds the quartiles when installed; otherwise use the stats folded during the chunked pass
+        if pl is not None:
+            summary_stats = get_lazy_summary_stats(uploaded_file.file_id, file_bytes)
+        if summary_stats is None and large_file_scan["summary"] is not None:
+            summary_stats = large_file_scan["summary"]
+            st.caption("Quartiles are skipped for large files.")
+    elif not df.empty and df.select_dtypes(include='number').shape[1] > 0:
+        summary_stats = get_summary_stats(uploaded_file.file_id, df)
 
-        # Add peak-to-peak (max-min) statistic
-        describe_data.loc["Peak-to-Peak"] = df.max() - df.min()
-
-        # Reorder rows
-        describe_order = ["min", "max", "Peak-to-Peak", "mean", "std", "count", "25%", "50%", "75%"]
-        describe_data = describe_data.loc[describe_order]
-
-        describe_data.rename(index={
-            "min": "Minimum",
-            "max": "Maximum",
-        }, inplace=True)
-
-        st.write(describe_data)
+    if summary_stats is not None:
+        st.write(summary_stats)
     else:
         st.warning("No numeric data available to analyze.")
 
 with plot_tab:
-    st.line_chart(df)
+    st.line_chart(chart_df)
 
 with raw_table_tab:
-    st.dataframe(df)
+    # Only a window of rows is sent to the browser; larger files get a slider to move the window
+    start_row = 0
+    if num_rows > RAW_TABLE_ROWS:
+        start_row = st.slider("Start row", 0, num_rows - RAW_TABLE_ROWS, 0)
+    end_row = min(start_row + RAW_TABLE_ROWS, num_rows)
+    if is_large_text_file:
+        st.dataframe(read_text_window(uploaded_file.file_id, file_bytes, start_row, column_names))
+    else:
+        st.dataframe(df.iloc[start_row:end_row])
+    st.caption(f"Showing rows {start_row:,}–{end_row:,} of {num_rows:,}")
 
 # Advanced Options
 with st.expander("Advanced Options - features not implemented yet"):
     normalize = st.checkbox("Normalize data")
-    remove_outliers = st.checkbox("Remove outliers")
\ No newline at end of file
+    remove_outliers = st.checkbox("Remove outliers")
@@ -14,11 +14,13 @@ OUTLINE:
 3. Plot results (make sure to convert to readable units) - add labels and title
 4. Find max, min, mean current value and find peak_to_peak (max - min) & display results in tkinter window 
 5. In tkinter output window have option to save results in a file 
+
+NOTE: Float columns are loaded as float32 (~7 significant digits). That is plenty for the
+LabVIEW current readings and halves memory compared to pandas' default float64.
 '''
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
 import tkinter as tk
 from tkinter import filedialog, messagebox 
 import os
@@ -28,8 +30,8 @@ Define functions
 '''
 
 def get_filepath():
-    '''File dialog to get the .csv data file that needs to be analyzed'''
-    filepath = filedialog.askopenfilename(title="Select a CSV file", filetypes=[("CSV files", "*.csv")])
+    '''File dialog to get the .csv or .parquet data file that needs to be analyzed'''
+    filepath = filedialog.askopenfilename(title="Select a CSV or Parquet file", filetypes=[("CSV files", "*.csv"), ("Parquet files", "*.parquet")])
     
     if filepath:
         messagebox.showinfo("File Selected", f"You selected:\n{filepath}")
@@ -39,9 +41,21 @@ def get_filepath():
         return None
 
 
-def load_data():
-    '''Load CSV data and return a pandas DataFrame'''
-    pass
+def load_data(filepath):
+    '''Load CSV (or Parquet) data and return a pandas DataFrame'''
+    try:
+        if filepath.lower().endswith(".parquet"):
+            df = pd.read_parquet(filepath)
+        else:
+            df = pd.read_csv(filepath, engine="pyarrow")
+    except (OSError, ValueError) as e:
+        messagebox.showerror("Error", f"Could not load data file:\n{e}")
+        return None
+
+    # Downcast float64 columns to float32
+    float_columns = df.select_dtypes(include="float64").columns
+    df[float_columns] = df[float_columns].astype("float32")
+    return df
 
 def analyze_current():
     '''Return min, max, mean, and peak_to_peak current values'''
@@ -77,10 +91,10 @@ def launch_analysis_ui():
     root.title("Y-PENG Current Analyzer")
     root.geometry("600x600")
 
-    label = tk.Label(root, text="Select a CSV file to analyze:")
+    label = tk.Label(root, text="Select a CSV or Parquet file to analyze:")
     label.pack(pady=10)
 
-    select_button = tk.Button(root, text="Browse CSV", command=get_results)
+    select_button = tk.Button(root, text="Browse Files", command=get_results)
     select_button.pack(pady=5)
 
     analyze_button = tk.Button(root, text="Analyze")